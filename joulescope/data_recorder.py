@@ -199,7 +199,13 @@ class DataRecorder:
 
 class DataReader:
 
-    def __init__(self):
+    def __init__(self, suppress_mode=None):
+        """Create a new instance.
+
+        :param suppress_mode: The optional current range switching filter
+            for raw sample processing.  None (default) uses the
+            :class:`RawProcessor` default.
+        """
         self.calibration = None
         self.config = None
         self.footer = None
@@ -210,6 +216,8 @@ class DataReader:
         self._voltage_range = 0
         self._sample_cache = None
         self.raw_processor = RawProcessor()
+        if suppress_mode is not None:
+            self.raw_processor.suppress_mode = suppress_mode
 
     def __str__(self):
         if self._f is not None:
@@ -662,6 +670,41 @@ class DataReader:
                 k_start = k_stop
         return out
 
+    def get_view(self, start=None, stop=None, increment=None, units=None):
+        """Get the calibrated data with statistics as a read-only array.
+
+        :param start: The starting sample identifier (inclusive).
+        :param stop: The ending sample identifier (exclusive).
+        :param increment: The number of raw samples per output sample.
+        :param units: The units for start and stop.
+            'seconds' or None is in floating point seconds relative to the view.
+            'samples' is in stream buffer sample indices.
+        :return: The read-only Nx3x4 sample data.
+
+        When increment matches the stored reduction and the range falls
+        within a single reduction block, the returned array references the
+        internal reduction cache without copying.  The array is only valid
+        until the next read.  Other requests fall back to :meth:`get`.
+        """
+        start, stop = self.normalize_time_arguments(start, stop, units)
+        if self._fh is None:
+            raise IOError('file not open')
+        sz = self.config['samples_per_reduction']
+        if increment is not None and max(1, int(np.round(increment))) == sz:
+            self._validate_range(start, stop)
+            r_start = start // sz
+            r_stop = r_start + (stop - start) // sz
+            if r_stop > r_start:
+                reduction_cache = self._reduction_tlv(r_start)
+                if reduction_cache is not None and r_stop <= reduction_cache['r_stop']:
+                    b_start = r_start - reduction_cache['r_start']
+                    out = reduction_cache['buffer'][b_start:(b_start + r_stop - r_start), :, :]
+                    out.flags.writeable = False
+                    return out
+        out = self.get(start, stop, increment)
+        out.flags.writeable = False
+        return out
+
     def summary_string(self):
         s = [str(self)]
         config_fields = ['sampling_frequency', 'samples_per_reduction', 'samples_per_tlv', 'samples_per_block']
@@ -752,6 +795,30 @@ class DataReader:
         """
         log.debug('statistics_get(%s, %s, %s)', start, stop, units)
         s1, s2 = self.normalize_time_arguments(start, stop, units)
+        return self._statistics_get(s1, s2)
+
+    def statistics_get_many(self, ranges, units=None):
+        """Get the statistics for the collected sample data over many time ranges.
+
+        :param ranges: The iterable of (start, stop) time ranges.
+        :param units: The units for start and stop.
+            'seconds' is in floating point seconds relative to the view.
+            'samples' or None is in stream buffer sample indices.
+        :return: The list of statistics data structures in the same order
+            as ranges.  See :meth:`statistics_get` for details.
+
+        This is a convenience wrapper around :meth:`statistics_get`.  Each
+        range is computed independently, in increasing start order, which
+        favors the forward-only file caches for disjoint ranges.
+        """
+        ranges = [self.normalize_time_arguments(start, stop, units) for start, stop in ranges]
+        log.debug('statistics_get_many(%d ranges)', len(ranges))
+        results = [None] * len(ranges)
+        for idx in sorted(range(len(ranges)), key=lambda k: ranges[k]):
+            results[idx] = self._statistics_get(*ranges[idx])
+        return results
+
+    def _statistics_get(self, s1, s2):
         if s1 == s2:
             s2 = s1 + 1  # always try to produce valid statistics
         s = self._stats_get(s1, s2)
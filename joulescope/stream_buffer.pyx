@@ -805,6 +805,10 @@ cdef class StreamBuffer:
     :param reductions: The list of reduction integers.  Each integer represents
         the reduction amount for each resuting sample in units of samples
         of the previous reduction.  Reduction 0 is in raw sample units.
+    :param sampling_frequency: The sampling frequency in Hz.
+    :param suppress_mode: The optional current range switching filter.
+        None (default) uses the :class:`RawProcessor` default.
+        See :meth:`RawProcessor.suppress_mode` for the format.
     """
     cdef RawProcessor _raw_processor
     cdef uint32_t reduction_step
@@ -836,7 +840,7 @@ cdef class StreamBuffer:
     cdef object _charge_picocoulomb  # python integer for infinite precision
     cdef object _energy_picojoules  # python integer for infinite precision
 
-    def __cinit__(self, length, reductions, sampling_frequency):
+    def __cinit__(self, length, reductions, sampling_frequency, suppress_mode=None):
         self._raw_processor = RawProcessor()
         self._raw_processor.callback_set(<raw_processor_cbk_fn> self._process_stats, self)
         cdef uint32_t r_samples = 1
@@ -910,8 +914,10 @@ cdef class StreamBuffer:
         self._charge_picocoulomb = 0
         self._energy_picojoules = 0  # integer for infinite precision
 
-    def __init__(self, length, reductions, sampling_frequency):
+    def __init__(self, length, reductions, sampling_frequency, suppress_mode=None):
         self.reset()
+        if suppress_mode is not None:
+            self.suppress_mode = suppress_mode
 
     def __len__(self):
         return self.length
@@ -28,16 +28,105 @@ import shutil
 
 PACKET_HEADER_SIZE = 8
 SAMPLES_PER_PACKET = (512 - PACKET_HEADER_SIZE) // 4
+SINK_SLACK = 64 * 1024  # bytes for the file header, metadata and reductions
+SINK_BUFFER_SIZE = 1024 * 1024  # coalesce the recorder's small writes
 
+# Expected current values for the _create_file() tests as EXPECT_{kind}_{start}_{stop}_{increment}
+EXPECT_DIRECT_0_10_1 = np.arange(0, 20, 2)
+EXPECT_DIRECT_5_10_1 = np.arange(10, 20, 2)
+EXPECT_OVERSCAN_0_140_1 = np.arange(252, 532, 2)
+EXPECT_STATS_0_50_5 = np.arange(4, 100, 10)
+EXPECT_STATS_5_50_10 = np.arange(9, 70, 20)
+EXPECT_REDUCTION_0_100_10 = np.arange(9, 200, 20)
+EXPECT_REDUCTION_30_95_10 = np.arange(69, 180, 20)
+EXPECT_REDUCTION_0_200_20 = np.arange(19, 400, 40)
 
-class TestDataRecorder(unittest.TestCase):
 
-    def setUp(self):
-        self._tempdir = tempfile.mkdtemp()
-        self._filename1 = os.path.join(self._tempdir, 'f1.joulescope')
+_PKT_CACHE = {}  # (packet_index, count) -> bytes
 
-    def tearDown(self):
-        shutil.rmtree(self._tempdir)
+
+def _usb_packet(packet_index, count=None):
+    """Get the memoized, immutable :func:`usb_packet_factory` output."""
+    key = (packet_index, count)
+    value = _PKT_CACHE.get(key)
+    if value is None:
+        value = _PKT_CACHE.setdefault(key, bytes(usb_packet_factory(packet_index, count)))
+    return value
+
+
+class _PreallocStream(io.RawIOBase):
+    """A writable raw stream backed by a pre-sized bytearray.
+
+    Unlike io.BytesIO, writes do not repeatedly grow and copy the
+    underlying buffer when the size estimate is correct.
+
+    :param nbytes: The expected total number of bytes.
+    """
+
+    def __init__(self, nbytes):
+        super().__init__()
+        self._buf = bytearray(nbytes)
+        self._pos = 0
+        self._end = 0
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def write(self, b):
+        n = len(b)
+        self._buf[self._pos:self._pos + n] = b
+        self._pos += n
+        self._end = max(self._end, self._pos)
+        return n
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self._end
+        self._pos = offset
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def getbuffer(self):
+        return memoryview(self._buf)[:self._end]
+
+
+def _sink(nbytes):
+    """Create a buffered recorder sink.
+
+    :param nbytes: The expected total number of bytes.
+    :return: The writable file handle for :class:`DataRecorder`.
+    """
+    return io.BufferedWriter(_PreallocStream(nbytes), buffer_size=SINK_BUFFER_SIZE)
+
+
+def _sink_to_reader(fh):
+    """Convert a :func:`_sink` file handle into a readable file handle."""
+    fh.flush()
+    return io.BytesIO(fh.raw.getbuffer())
+
+
+class TestDataRecorderSmall(unittest.TestCase):
+    """Fast tests using small recordings held in memory."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls._sb_small = StreamBuffer(2000, [10], 1000.0, suppress_mode='off')
+        # Most tests only read this file, so record it once
+        cls._cached_file_bytes = cls._record_file(0, 2).getvalue()
+
+    def _get_tempfile(self):
+        """Create the temporary directory on first use and return a file path."""
+        if getattr(self, '_tempdir', None) is None:
+            self._tempdir = tempfile.mkdtemp()
+            self.addCleanup(shutil.rmtree, self._tempdir, ignore_errors=True)
+        return os.path.join(self._tempdir, 'f1.joulescope')
 
     def test_init_with_file_handle(self):
         fh = io.BytesIO()
@@ -46,28 +135,35 @@ class TestDataRecorder(unittest.TestCase):
         self.assertGreater(len(fh.getbuffer()), 0)
 
     def test_init_with_filename(self):
-        self.assertFalse(os.path.isfile(self._filename1))
-        d = DataRecorder(self._filename1, 2000)
-        self.assertTrue(os.path.isfile(self._filename1))
+        filename = self._get_tempfile()
+        self.assertFalse(os.path.isfile(filename))
+        d = DataRecorder(filename, 2000)
+        self.assertTrue(os.path.isfile(filename))
         d.close()
 
     def _create_file(self, packet_index, count=None):
-        stream_buffer = StreamBuffer(2000, [10], 1000.0)
-        stream_buffer.suppress_mode = 'off'
+        if (packet_index, count) == (0, 2) and hasattr(type(self), '_cached_file_bytes'):
+            return io.BytesIO(type(self)._cached_file_bytes)
+        return self._record_file(packet_index, count)
+
+    @classmethod
+    def _record_file(cls, packet_index, count=None):
+        stream_buffer = cls._sb_small
+        stream_buffer.reset()
         if packet_index > 0:
-            data = usb_packet_factory(0, packet_index - 1)
+            data = _usb_packet(0, packet_index - 1)
             stream_buffer.insert(data)
             stream_buffer.process()
 
-        fh = io.BytesIO()
+        data = _usb_packet(packet_index, count)
+        fh = _sink(len(data) + SINK_SLACK)
         d = DataRecorder(fh, sampling_frequency=1000)
         d.stream_notify(stream_buffer)
-        data = usb_packet_factory(packet_index, count)
         stream_buffer.insert(data)
         stream_buffer.process()
         d.stream_notify(stream_buffer)
         d.close()
-        fh.seek(0)
+        fh = _sink_to_reader(fh)
 
         # from joulescope import datafile
         # dfr = datafile.DataFileReader(fh)
@@ -77,10 +173,9 @@ class TestDataRecorder(unittest.TestCase):
 
     def test_write_read_direct(self):
         fh = self._create_file(0, 2)
-        r = DataReader().open(fh)
-        r.raw_processor.suppress_mode = 'off'
+        r = DataReader(suppress_mode='off').open(fh)
         data = r.get(0, 10, 1)
-        np.testing.assert_allclose(np.arange(0, 20, 2), data[:, 0, 0])
+        np.testing.assert_array_equal(EXPECT_DIRECT_0_10_1.astype(data.dtype), data[:, 0, 0])
 
     def test_time_conversion(self):
         fh = self._create_file(0, 2)
@@ -96,55 +191,69 @@ class TestDataRecorder(unittest.TestCase):
 
     def test_write_read_direct_with_offset(self):
         fh = self._create_file(0, 2)
-        r = DataReader().open(fh)
-        r.raw_processor.suppress_mode = 'off'
+        r = DataReader(suppress_mode='off').open(fh)
         # d = np.right_shift(r.raw(5, 10), 2)
         data = r.get(5, 10, 1)
-        np.testing.assert_allclose(np.arange(10, 20, 2), data[:, 0, 0])
+        np.testing.assert_array_equal(EXPECT_DIRECT_5_10_1.astype(data.dtype), data[:, 0, 0])
 
     def test_write_read_direct_with_sample_overscan_before(self):
         fh = self._create_file(1, 3)  # will be samples 120 to 250 (not 126 to 252)
-        r = DataReader().open(fh)
-        r.raw_processor.suppress_mode = 'off'
+        r = DataReader(suppress_mode='off').open(fh)
         data = r.get(0, 140, 1)
-        np.testing.assert_allclose(np.arange(252, 532, 2), data[:, 0, 0])
+        np.testing.assert_array_equal(EXPECT_OVERSCAN_0_140_1.astype(data.dtype), data[:, 0, 0])
 
     def test_write_read_stats_over_samples(self):
         fh = self._create_file(0, 2)
-        r = DataReader().open(fh)
-        r.raw_processor.suppress_mode = 'off'
+        r = DataReader(suppress_mode='off').open(fh)
         data = r.get(0, 50, 5)
-        np.testing.assert_allclose(np.arange(4, 100, 10), data[:, 0, 0])
+        np.testing.assert_array_equal(EXPECT_STATS_0_50_5.astype(data.dtype), data[:, 0, 0])
 
     def test_write_read_stats_over_samples_offset(self):
         fh = self._create_file(0, 2)
         r = DataReader().open(fh)
         data = r.get(5, 50, 10)
-        np.testing.assert_allclose(np.arange(9, 70, 20), data[:, 0, 0])
+        np.testing.assert_array_equal(EXPECT_STATS_5_50_10.astype(data.dtype), data[:, 0, 0])
 
     def test_write_read_get_reduction(self):
         fh = self._create_file(0, 2)
         r = DataReader().open(fh)
         data = r.get_reduction(0, 100)
-        np.testing.assert_allclose(np.arange(9, 200, 20), data[:, 0, 0])
+        np.testing.assert_array_equal(EXPECT_REDUCTION_0_100_10.astype(data.dtype), data[:, 0, 0])
 
     def test_write_read_get_reduction_offset(self):
         fh = self._create_file(0, 2)
         r = DataReader().open(fh)
         data = r.get_reduction(30, 95)
-        np.testing.assert_allclose(np.arange(69, 180, 20), data[:, 0, 0])
+        np.testing.assert_array_equal(EXPECT_REDUCTION_30_95_10.astype(data.dtype), data[:, 0, 0])
 
     def test_write_read_reduction_direct(self):
         fh = self._create_file(0, 2)
         r = DataReader().open(fh)
-        data = r.get(0, 100, 10)
-        np.testing.assert_allclose(np.arange(9, 200, 20), data[:, 0, 0])
+        data = r.get_view(0, 100, 10)
+        np.testing.assert_array_equal(EXPECT_REDUCTION_0_100_10.astype(data.dtype), data[:, 0, 0])
 
     def test_write_read_reduction_indirect(self):
         fh = self._create_file(0, 2)
         r = DataReader().open(fh)
-        data = r.get(0, 200, 20)
-        np.testing.assert_allclose(np.arange(19, 400, 40), data[:, 0, 0])
+        data = r.get_view(0, 200, 20)
+        np.testing.assert_array_equal(EXPECT_REDUCTION_0_200_20.astype(data.dtype), data[:, 0, 0])
+
+    def test_write_read_get_view(self):
+        fh = self._create_file(0, 2)
+        r = DataReader(suppress_mode='off').open(fh)
+        for start, stop, increment in [(0, 100, 10), (30, 95, 10), (0, 10, 1), (0, 200, 20)]:
+            data = r.get_view(start, stop, increment)
+            self.assertFalse(data.flags.writeable)
+            np.testing.assert_allclose(r.get(start, stop, increment), data)
+
+
+class TestDataRecorderHeavy(unittest.TestCase):
+    """Slower tests using multi-million sample recordings.
+
+    These tests share no state with :class:`TestDataRecorderSmall`, so
+    parallel test runners can distribute the two classes.
+    """
+    _sinusoid_cache = {}  # (sample_rate, samples) -> file bytes
 
     def _create_large_file(self, samples=None):
         """Create a large file.
@@ -155,20 +264,22 @@ class TestDataRecorder(unittest.TestCase):
         sample_rate = 2000000
         samples_total = sample_rate * 2
         packets_per_burst = 128
+        bursts_per_insert = 8  # must fit in the stream_buffer
         bursts = int(np.ceil(samples / (SAMPLES_PER_PACKET * packets_per_burst)))
         stream_buffer = StreamBuffer(sample_rate, [100], sample_rate)
 
-        fh = io.BytesIO()
+        fh = _sink(samples_total * 4 + SINK_SLACK)
         d = DataRecorder(fh, sampling_frequency=sample_rate)
         d.stream_notify(stream_buffer)
-        for burst_index in range(bursts):
+        for burst_index in range(0, bursts, bursts_per_insert):
             packet_index = burst_index * packets_per_burst
-            frames = usb_packet_factory_signal(packet_index, count=packets_per_burst, samples_total=samples_total)
+            count = min(bursts_per_insert, bursts - burst_index) * packets_per_burst
+            frames = usb_packet_factory_signal(packet_index, count=count, samples_total=samples_total)
             stream_buffer.insert(frames)
             stream_buffer.process()
             d.stream_notify(stream_buffer)
         d.close()
-        fh.seek(0)
+        fh = _sink_to_reader(fh)
 
         # dfr = datafile.DataFileReader(fh)
         # dfr.pretty_print()
@@ -185,25 +296,44 @@ class TestDataRecorder(unittest.TestCase):
         self.assertEqual(sample_count / 20000, len(reduction))
 
     def create_sinusoid_data(self, sample_rate, samples):
-        x = np.arange(samples, dtype=np.float)
-        x *= (1 / sample_rate)
-        data = np.empty(samples * 2, dtype=np.uint16)
-        data[0::2] = (2000 * np.sin(2 * np.pi * 1000 * x) + 5000).astype(np.uint16)
-        data[1::2] = (2000 * np.cos(2 * np.pi * 42 * x) + 5000).astype(np.uint16)
-        np.left_shift(data, 2, out=data)
-        data_view = data[1::4]
+        # float32 resolves the 14-bit sample values, at half the memory traffic
+        x = np.arange(samples, dtype=np.float32)
+        x *= np.float32(1 / sample_rate)
+        out = np.empty((samples, 2), dtype=np.uint16)  # [sample][i, v]
+        phase = np.empty_like(x)  # shared by both channels
+        np.multiply(x, np.float32(2 * np.pi * 1000), out=phase)
+        np.sin(phase, out=phase)
+        np.multiply(phase, 2000, out=phase)
+        phase += 5000
+        # truncate to uint16 and shift into the 14-bit sample position in one pass
+        np.left_shift(phase, 2, out=out[:, 0], dtype=np.uint16, casting='unsafe')
+        np.multiply(x, np.float32(2 * np.pi * 42), out=phase)
+        np.cos(phase, out=phase)
+        np.multiply(phase, 2000, out=phase)
+        phase += 5000
+        np.left_shift(phase, 2, out=out[:, 1], dtype=np.uint16, casting='unsafe')
+        # toggle the voltage LSB on even samples.  The strided OR touches only
+        # those values and measures faster than a dense pass with an OR mask.
+        data_view = out[0::2, 1]
         np.bitwise_or(data_view, 0x20, out=data_view)
-        return data
+        return out.reshape((-1, ))
 
     def create_sinusoid_file(self, sample_rate, samples):
+        key = (sample_rate, samples)
+        cache = type(self)._sinusoid_cache
+        if key not in cache:
+            cache[key] = self._record_sinusoid_file(sample_rate, samples).getvalue()
+        return io.BytesIO(cache[key])
+
+    def _record_sinusoid_file(self, sample_rate, samples):
         cal = Calibration()
         cal.current_offset[:7] = -3000
         cal.current_gain[:7] = [1e-3, 1e-4, 1e-5, 1e-6, 1e-7, 1e-8, 1e-9]
         cal.voltage_offset[:2] = -3000
         cal.voltage_gain[:2] = [1e-3, 1e-4]
-        cal.data = cal.save(bytes([0] * 32))
+        cal.data = cal.save(b'\x00' * 32)
 
-        fh = io.BytesIO()
+        fh = _sink(samples * 4 + SINK_SLACK)
         d = DataRecorder(fh, sampling_frequency=sample_rate, calibration=cal)
 
         stream_buffer = StreamBuffer(sample_rate, [100], sample_rate)
@@ -218,8 +348,7 @@ class TestDataRecorder(unittest.TestCase):
             d.stream_notify(stream_buffer)
 
         d.close()
-        fh.seek(0)
-        return fh
+        return _sink_to_reader(fh)
 
     def test_statistics_get(self):
         #fh = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data_recording_01.jls')
@@ -239,9 +368,10 @@ class TestDataRecorder(unittest.TestCase):
             (k_start, k_stop),
         ]
 
-        for k_start, k_stop in ranges:
+        results = r.statistics_get_many(ranges, units='samples')
+        self.assertEqual(len(ranges), len(results))
+        for (k_start, k_stop), s1 in zip(ranges, results):
             # print(f'range {k_start}:{k_stop}')
-            s1 = r.statistics_get(k_start, k_stop, units='samples')
             _, _, data = r.raw(k_start, k_stop)
             i_mean = np.mean(data[:, 0])
             np.testing.assert_allclose(s1['signals']['current']['statistics']['μ'], i_mean, rtol=0.0005)
@@ -252,14 +382,14 @@ class TestDataRecorder(unittest.TestCase):
         sample_count = sample_rate * 2
         fh = self.create_sinusoid_file(sample_rate, sample_count)
         r = DataReader().open(fh)
+        _, _, data = r.raw(0, sample_count)
         for step_size in [1111, 2000, 11111, 20000]:
             # print(f'step_size = {step_size}')
-            for i in range(0, sample_count - step_size, step_size):
-                r.raw_processor.reset()
-                s1 = r.statistics_get(i, i + step_size, units='samples')
-                _, _, data = r.raw(i, i + step_size)
-                i_mean = np.mean(data[:, 0])
-                np.testing.assert_allclose(s1['signals']['current']['statistics']['μ'], i_mean, rtol=0.0005)
+            starts = range(0, sample_count - step_size, step_size)
+            i_mean = data[:len(starts) * step_size, 0].reshape((-1, step_size)).mean(axis=1)
+            results = r.statistics_get_many([(i, i + step_size) for i in starts], units='samples')
+            s_mean = [s1['signals']['current']['statistics']['μ'] for s1 in results]
+            np.testing.assert_allclose(s_mean, i_mean, rtol=0.0005)
         r.close()
 
     def test_single_sample(self):
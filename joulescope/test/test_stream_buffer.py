@@ -214,6 +214,12 @@ class TestStreamBuffer(unittest.TestCase):
         self.assertEqual(1.0, b.sample_id_to_time(0))
         del b
 
+    def test_init_suppress_mode(self):
+        b = StreamBuffer(1000, [10, 10], 1000.0, suppress_mode='off')
+        self.assertEqual('off', b.suppress_mode)
+        b.reset()
+        self.assertEqual('off', b.suppress_mode)
+
     def test_insert_process(self):
         b = StreamBuffer(1000, [100, 10], 1000.0)
         b.suppress_mode = 'off'
@@ -52,3 +52,116 @@ class TestView(unittest.TestCase):
     def test_statistics_get(self):
         s1 = self.v.statistics_get(-2, -1, units='samples')
         # todo  test
+
+    def _update_get(self):
+        updates = []
+        self.v.on_update_fn = updates.append
+        self.v.refresh(force=True)
+        self.v.ping()
+        return updates[-1]
+
+    def test_update_incremental_matches_full(self):
+        self.b.suppress_mode = 'off'
+        self.v.on_x_change('resize', {'pixels': 100})
+        self.v.start(self.b)
+        self._update_get()
+        packet_index = 2
+        for count in [1, 3, 1]:
+            self.b.insert(usb_packet_factory(packet_index, count))
+            self.b.process()
+            packet_index += count
+            self.v.stream_notify(self.b)
+            incremental = self._update_get()
+        self.v.on_x_change('refresh', {})
+        full = self._update_get()
+        for name, signal in full['signals'].items():
+            for field in ['μ', 'σ2', 'min', 'max']:
+                np.testing.assert_array_equal(signal[field], incremental['signals'][name][field])
+        self.assertEqual(full['time']['range'], incremental['time']['range'])
+
+    def test_update_signals_contiguous_and_stable(self):
+        self.b.suppress_mode = 'off'
+        self.v.on_x_change('resize', {'pixels': 100})
+        self.v.start(self.b)
+        first = self._update_get()
+        expect = {name: signal['μ'].copy() for name, signal in first['signals'].items()}
+        for signal in first['signals'].values():
+            for field in ['μ', 'σ2', 'min', 'max']:
+                self.assertTrue(signal[field].flags['C_CONTIGUOUS'])
+        self.b.insert(usb_packet_factory(2, 3))
+        self.b.process()
+        self.v.stream_notify(self.b)
+        self._update_get()
+        for name, signal in first['signals'].items():
+            np.testing.assert_array_equal(expect[name], signal['μ'])
+
+    def test_resize_reuses_storage(self):
+        self.b.suppress_mode = 'off'
+        self.v.on_x_change('resize', {'pixels': 100})
+        self.v.start(self.b)
+        full = self._update_get()
+        for pixels in [50, 100]:
+            self.v.on_x_change('resize', {'pixels': pixels})
+            update = self._update_get()
+            self.assertEqual(pixels, len(update['signals']['current']['μ']))
+        for name, signal in full['signals'].items():
+            np.testing.assert_array_equal(signal['μ'], update['signals'][name]['μ'])
+
+    def test_samples_get(self):
+        self.b.suppress_mode = 'off'
+        data = self.b.data_get(10, 20)
+        s = self.v.samples_get(10, 20, units='samples')
+        for idx, name in enumerate(['current', 'voltage', 'power', 'current_range', 'current_lsb', 'voltage_lsb']):
+            value = s['signals'][name]['value']
+            self.assertTrue(value.flags['C_CONTIGUOUS'])
+            np.testing.assert_array_equal(data[:, idx, 0], value)
+        self.assertEqual('A', s['signals']['current']['units'])
+        self.assertEqual(10, len(s['signals']['raw']['value']))
+
+    def test_span_pan_matches_full(self):
+        self.b.suppress_mode = 'off'
+        self.b.insert(usb_packet_factory(2, 12))
+        self.b.process()
+        self.v.on_x_change('resize', {'pixels': 100})
+        self.v.on_x_change('span_absolute', {'range': [0.5, 0.9]})
+        self._update_get()
+        for delta in [-0.05, -0.1, 0.02]:
+            self.v.on_x_change('span_pan', {'delta': delta})
+            pan = self._update_get()
+            self.v.on_x_change('refresh', {})
+            full = self._update_get()
+            np.testing.assert_array_equal(full['time']['x'], pan['time']['x'])
+            for name, signal in full['signals'].items():
+                for field in ['μ', 'σ2', 'min', 'max']:
+                    np.testing.assert_array_equal(signal[field], pan['signals'][name][field])
+
+
+class TestViewUpdateSkip(unittest.TestCase):
+
+    def setUp(self):
+        self.b = StreamBuffer(2000, [10, 10], sampling_frequency=1000, suppress_mode='off')
+        self.b.insert(usb_packet_factory(0, 14))
+        self.b.process()
+        self.v = View(stream_buffer=self.b, calibration=None)  # no thread: drive _update directly
+        self.updates = []
+        self.v.on_update_fn = self.updates.append
+        self.v._on_x_change('resize', {'pixels': 50})
+
+    def test_stream_notify_without_new_column_skips_update(self):
+        self.v._update()
+        self.assertEqual(1, len(self.updates))
+        self.v._stream_notify(self.b)
+        self.v._update()
+        self.assertEqual(1, len(self.updates))
+        self.v._update(force=True)
+        self.assertEqual(2, len(self.updates))
+
+    def test_span_pan_moving_only_x_emits_update(self):
+        self.v._on_x_change('span_absolute', {'range': [1.321, 2.021]})
+        self.v._update()
+        x_range = self.updates[-1]['time']['range']
+        self.v._on_x_change('span_pan', {'delta': 0.3})
+        self.assertEqual(0, self.v._view()[2])  # the data columns do not move
+        self.v._update()
+        self.assertEqual(2, len(self.updates))
+        self.assertNotEqual(x_range, self.updates[-1]['time']['range'])
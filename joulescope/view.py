@@ -21,43 +21,68 @@ import logging
 
 
 TIMEOUT = 10.0
+SIGNALS = (  # (name, units) in STATS_FIELDS order
+    ('current', 'A'),
+    ('voltage', 'V'),
+    ('power', 'W'),
+    ('current_range', ''),
+    ('current_lsb', ''),
+    ('voltage_lsb', ''),
+)
+
+
+def _soa_statistics(b, idx, units):
+    """Get the statistics for a single field.
+
+    :param b: The STATS_FIELDS x STATS_VALUES x N np.ndarray, which
+        is not modified after this call.
+    :param idx: The field index.
+    :param units: The units for the field.
+    :return: The statistics dict with contiguous views into b.
+    """
+    return {
+        'μ': b[idx, 0],
+        'σ2': b[idx, 1],
+        'min': b[idx, 2],
+        'max': b[idx, 3],
+        'units': units,
+    }
+
 
+def x_to_time(x_limits, x):
+    """Get the time portion of a view update.
 
-def to_view_statistics(b, idx, units):
+    :param x_limits: The (x_min, x_max) or None if unknown.
+    :param x: The np.ndarray of x-axis times.
+    :return: The time dict.
+    """
+    first, last = float(x[0]), float(x[-1])
     return {
-        'μ': b[:, idx, 0].copy(),
-        'σ2': b[:, idx, 1].copy(),
-        'min': b[:, idx, 2].copy(),
-        'max': b[:, idx, 3].copy(),
-        'units': units,
+        'x': x,
+        'limits': x_limits,
+        'range': [first, last],
+        'delta': last - first,
+        'units': 's',
     }
 
 
-def data_array_to_update(x_limits, x, data_array):
+def data_array_to_update(x_limits, x, data_array, time=None):
     """Convert raw data buffer to a view update.
 
-    :param x_limits: The list of [x_min, x_max] or None if unknown.
+    :param x_limits: The (x_min, x_max) or None if unknown.
     :param x: The np.ndarray of x-axis times.
     :param data_array: The N x STATS_FIELDS x STATS_VALUES np.ndarray containing:
         current, voltage, power, current_range, current_lsb, voltage_lsb
         mean, variance, minimum, maximum
+    :param time: The optional time dict from :func:`x_to_time` for
+        x_limits and x, which may be shared between updates.
+        None (default) constructs a new one.
     """
+    # single copy into [field][stat][N] so each signal is contiguous
+    b = np.ascontiguousarray(np.transpose(data_array, (1, 2, 0)))
     return {
-        'time': {
-            'x': x,
-            'limits': x_limits,
-            'range': [float(x[0]), float(x[-1])],
-            'delta': float(x[-1] - x[0]),
-            'units': 's',
-        },
-        'signals': {
-            'current': to_view_statistics(data_array, 0, 'A'),
-            'voltage': to_view_statistics(data_array, 1, 'V'),
-            'power': to_view_statistics(data_array, 2, 'W'),
-            'current_range': to_view_statistics(data_array, 3, ''),
-            'current_lsb': to_view_statistics(data_array, 4, ''),
-            'voltage_lsb': to_view_statistics(data_array, 5, ''),
-        },
+        'time': x_to_time(x_limits, x) if time is None else time,
+        'signals': {name: _soa_statistics(b, idx, units) for idx, (name, units) in enumerate(SIGNALS)},
         'state': {
             'source_type': 'buffer',  # ['realtime', 'buffer']
         }
@@ -71,22 +96,41 @@ class View:
         self._stream_buffer = None
         self._calibration = calibration
         self._x = None
+        self._time = None  # x_to_time(self.limits, self._x) cache for updates
         self._data = None  # NxMx4 np.float32 [length][current, voltage, power][mean, var, min, max]
+        self._data_storage = None  # capacity x M x 4, self._data is a leading slice
+        self._is_clean = False  # True when self._data is known to be all NaN
         self._x_range = [0.0, 1.0]  # the initial default range
         self._samples_per = 1
+        self._lag_samples = 0  # view end lag behind the stream end, in samples_per units
         self._data_idx = 0
         self._span = None
+        self._span_limits = None  # tuple(self._span.limits), fixed at construction
+        self._sampling_frequency = None  # cached self._stream_buffer.sampling_frequency
         self._changed = True
+        self._x_changed = False  # x axis changed without invalidating self._data
         self._stream_notify_available = False  # flag when stream_notify called
+        self._stream_notify_buffer = None  # latest stream_notify buffer, consumed by the thread
+        self._stream_notify_pending = threading.Event()  # stream_notify command queued
         self._refresh_requested = False
         self._log = logging.getLogger(__name__)
 
         self._thread = None
-        self._cmd_queue = queue.Queue()  # tuples of (command, args, callback)
-        self._response_queue = queue.Queue()
+        self._cmd_queue = queue.SimpleQueue()  # tuples of (command, args, callback)
         self.on_update_fn = None  # callable(data)
         self._quit = False
         self.on_close = None  # optional callable() on close
+        self._cmd_handlers = {  # command -> callable(args)
+            'stream_notify': self._cmd_stream_notify,
+            'refresh': self._cmd_refresh,
+            'on_x_change': lambda args: self._on_x_change(*args),
+            'samples_get': lambda args: self._samples_get(**args),
+            'statistics_get': lambda args: self._statistics_get(**args),
+            'start': lambda args: self._start(),
+            'stop': lambda args: self._stop(),
+            'ping': lambda args: args,
+            'close': self._cmd_close,
+        }
 
         if stream_buffer is not None:
             self._stream_buffer_assign(stream_buffer)
@@ -95,14 +139,17 @@ class View:
         if self._stream_buffer == stream_buffer:
             return
         self._stream_buffer = stream_buffer
+        self._sampling_frequency = stream_buffer.sampling_frequency
         self._x_range = list(self._stream_buffer.limits_time)  # the initial default range
         length = len(self)
         if length <= 0:
             length = 100
         # todo : investigate - may want inclusive max time (not exclusive) -- off by 1 error?
         self._span = span.Span(limits=self._stream_buffer.limits_time,
-                               quant=1.0 / self.sampling_frequency,
+                               quant=1.0 / self._sampling_frequency,
                                length=length)
+        self._span_limits = tuple(self._span.limits)
+        self._lag_samples_update()
 
     def __len__(self):
         if self._data is None:
@@ -121,39 +168,33 @@ class View:
 
     @property
     def limits(self):
-        """Get the (x_min, x_max) limits for the view."""
-        if self._span is not None:
-            return list(self._span.limits)
-        return None
+        """Get the (x_min, x_max) limits tuple for the view."""
+        return self._span_limits
+
+    def _cmd_stream_notify(self, args):
+        # clear before reading so that a racing stream_notify posts again
+        self._stream_notify_pending.clear()
+        return self._stream_notify(stream_buffer=self._stream_notify_buffer)
+
+    def _cmd_refresh(self, args):
+        if bool(args['force']):
+            self._log.debug('view refresh(force=True) requested')
+            self._update(force=True)
+        else:
+            self._refresh_requested = True
+
+    def _cmd_close(self, args):
+        self._quit = True
 
     def _cmd_process(self, cmd, args):
         rv = None
         try:
             # self._log.debug('_cmd_process %s - start', cmd)
-            if cmd == 'stream_notify':
-                rv = self._stream_notify(stream_buffer=args)
-            elif cmd == 'refresh':
-                if bool(args['force']):
-                    self._log.debug('view refresh(force=True) requested')
-                    self._update()
-                else:
-                    self._refresh_requested = True
-            elif cmd == 'on_x_change':
-                rv = self._on_x_change(*args)
-            elif cmd == 'samples_get':
-                rv = self._samples_get(**args)
-            elif cmd == 'statistics_get':
-                rv = self._statistics_get(**args)
-            elif cmd == 'start':
-                rv = self._start()
-            elif cmd == 'stop':
-                rv = self._stop()
-            elif cmd == 'ping':
-                return args
-            elif cmd == 'close':
-                self._quit = True
-            else:
+            handler = self._cmd_handlers.get(cmd)
+            if handler is None:
                 self._log.warning('unsupported command %s', cmd)
+            else:
+                rv = handler(args)
         except:
             self._log.exception('While running command')
         # self._log.debug('_cmd_process %s - done', cmd)
@@ -168,7 +209,8 @@ class View:
                 cmd, args, cbk = self._cmd_queue.get(timeout=timeout)
             except queue.Empty:
                 timeout = 1.0
-                if cmd_count and self._refresh_requested and (self._changed or self._stream_notify_available):
+                if cmd_count and self._refresh_requested and \
+                        (self._changed or self._x_changed or self._stream_notify_available):
                     self._update()
                 cmd_count = 0
                 continue
@@ -191,67 +233,102 @@ class View:
     def _post_block(self, command, args=None, timeout=None):
         timeout = TIMEOUT if timeout is None else float(timeout)
         # self._log.debug('_post_block %s start', command)
-        while not self._response_queue.empty():
-            self._log.warning('response queue not empty')
-            try:
-                self._response_queue.get(timeout=0.0)
-            except queue.Empty:
-                pass
         if self._thread is None:
             raise IOError('View thread not running')
-        self._post(command, args, lambda rv_=None: self._response_queue.put(rv_))
-        try:
-            rv = self._response_queue.get(timeout=timeout)
-        except queue.Empty as ex:
+        response = []  # per call, so concurrent callers cannot see each other's result
+        event = threading.Event()
+
+        def cbk(rv_=None):
+            response.append(rv_)
+            event.set()
+
+        self._post(command, args, cbk)
+        if not event.wait(timeout=timeout):
             self._log.error('view thread hung: %s - FORCE CLOSE', command)
             self._post('close', None, None)
             self._thread.join(timeout=TIMEOUT)
             self._thread = None
-            rv = ex
-        except Exception as ex:
-            rv = ex
+            raise IOError(f'view thread hung: {command}')
+        rv = response[0]
         if isinstance(rv, Exception):
             raise IOError(rv)
         # self._log.debug('_post_block %s done', command)  # rv
         return rv
 
     def _update_from_buffer(self):
+        """Bring self._data up to date with the stream buffer.
+
+        :return: False if the view data is unchanged, True otherwise.
+        """
         buffer = self._stream_buffer
         if buffer is None:
-            return
+            return True
         length = len(self)
         data_idx_view_end, sample_id_end, delta = self._view()
 
         if self._data is None:
-            return
+            return True
         elif not self._changed and 0 == delta:
-            return
-        elif self._changed or delta >= length:  # perform full recompute
-            self._data[:, :, :] = np.nan
+            return False
+        elif self._changed or delta >= length or -delta >= length:  # perform full recompute
+            filled = 0
             if data_idx_view_end > 0:
                 start_idx = (data_idx_view_end - length) * self._samples_per
                 # self.log.debug('recompute(start=%s, stop=%s, increment=%s)', start_idx, sample_id_end, self.samples_per)
-                buffer.data_get(start_idx, sample_id_end, self._samples_per, self._data)
-        elif data_idx_view_end > 0:
+                filled = len(buffer.data_get(start_idx, sample_id_end, self._samples_per, self._data))
+            if not self._is_clean:
+                self._data[filled:, :, :] = np.nan  # only what data_get did not populate
+            self._is_clean = not filled
+        elif data_idx_view_end > 0 and delta > 0:  # view moved forward
             start_idx = self._data_idx * self._samples_per
             # self.log.debug('update(start=%s, stop=%s, increment=%s)', start_idx, sample_id_end, self.samples_per)
-            self._data = np.roll(self._data, -delta, axis=0)
-            buffer.data_get(start_idx, sample_id_end, self._samples_per, self._data[-delta:, :, :])
-        else:
+            # shift in place: numpy buffers an overlapping N-D copy in a temporary,
+            # but copies overlapping 1-D same-direction views directly (memmove)
+            if not self._is_clean:
+                flat = self._data.reshape(-1)
+                shift = delta * STATS_FIELDS * STATS_VALUES
+                flat[:-shift] = flat[shift:]
+            filled = len(buffer.data_get(start_idx, sample_id_end, self._samples_per, self._data[-delta:, :, :]))
+            if filled < delta and not self._is_clean:
+                self._data[length - delta + filled:, :, :] = np.nan
+            self._is_clean = self._is_clean and not filled
+        elif data_idx_view_end > 0:  # view moved back, such as span_pan
+            delta = -delta
+            if not self._is_clean:
+                flat = self._data.reshape(-1)
+                shift = delta * STATS_FIELDS * STATS_VALUES
+                flat[shift:] = flat[:-shift]
+            start_idx = (data_idx_view_end - length) * self._samples_per
+            stop_idx = start_idx + delta * self._samples_per
+            filled = len(buffer.data_get(start_idx, stop_idx, self._samples_per, self._data[:delta, :, :]))
+            if filled < delta and not self._is_clean:
+                self._data[filled:delta, :, :] = np.nan
+            self._is_clean = self._is_clean and not filled
+        elif not self._is_clean:  # view ends before the stream starts
             self._data[:, :, :] = np.nan
+            self._is_clean = True
         self._data_idx = data_idx_view_end
         self._changed = False
+        return True
 
-    def _update(self):
+    def _update(self, force=None):
         if not callable(self.on_update_fn):
             return
-        self._update_from_buffer()
+        if not self._update_from_buffer() and not force and not self._x_changed:
+            self._stream_notify_available = False
+            self._refresh_requested = False
+            return  # nothing new to show
         if self._data is None:
             data = None
         else:
-            data = data_array_to_update(self.limits, self._x, self._data)
+            time = self._time
+            if time is None or time['x'] is not self._x or time['limits'] is not self._span_limits:
+                time = x_to_time(self._span_limits, self._x)
+                self._time = time
+            data = data_array_to_update(self._span_limits, self._x, self._data, time)
             if self._state != 'idle':
                 data['state']['source_type'] = 'realtime'
+        self._x_changed = False
         self._stream_notify_available = False
         self._refresh_requested = False
         try:
@@ -260,11 +337,11 @@ class View:
             self._log.exception('in on_update_fn')
 
     def _clear(self):
+        # no NaN fill: _changed marks every row invalid, and the full
+        # recompute rewrites every row before self._data is shipped
         self._changed = True
         self._refresh_requested = True
         self._data_idx = 0
-        if self._data is not None:
-            self._data[:, :, :] = np.nan
 
     def _start(self):
         self._log.debug('start')
@@ -277,13 +354,19 @@ class View:
 
     def _on_x_change(self, cmd, kwargs):
         x_range = list(self._x_range)
+        samples_per = self._samples_per
         if cmd == 'resize':  # {pixels: int}
             length = kwargs['pixels']
             if length is not None and length != len(self):
                 self._log.info('resize %s', length)
                 self._span.length = length
-                self._data = np.full((length, STATS_FIELDS, STATS_VALUES), np.nan, dtype=np.float32)
-                self._changed = True  # invalidate
+                capacity = 0 if self._data_storage is None else len(self._data_storage)
+                if length > capacity:
+                    capacity = max(length, capacity * 2, 1024)
+                    self._data_storage = np.empty((capacity, STATS_FIELDS, STATS_VALUES), dtype=np.float32)
+                self._data = self._data_storage[:length]  # contiguous, as data_get requires
+                self._is_clean = False
+                self._changed = True  # invalidate, full recompute refills all rows
             x_range, self._samples_per, self._x = self._span.conform_discrete(x_range)
         elif cmd == 'span_absolute':  # {range: (start: float, stop: float)}]
             x_range, self._samples_per, self._x = self._span.conform_discrete(kwargs.get('range'))
@@ -303,28 +386,37 @@ class View:
             return
 
         if self._state == 'streaming':
-            x_max = self._span.limits[1]
+            x_max = self._span_limits[1]
             if x_range[1] < x_max:
                 x_shift = x_max - x_range[1]
                 x_range = [x_range[0] + x_shift, x_max]
             x_range, self._samples_per, self._x = self._span.conform_discrete(x_range)
 
-        self._changed |= (self._x_range != x_range)
-        self._clear()
+        if cmd == 'span_pan' and self._samples_per == samples_per and not self._changed:
+            # same column width: _update_from_buffer shifts the existing
+            # columns and only fetches the newly exposed ones
+            self._x_changed |= (self._x_range != x_range)
+            self._refresh_requested = True
+        else:
+            self._changed |= (self._x_range != x_range)
+            self._clear()
         self._x_range = x_range
+        self._lag_samples_update()
         self._log.info('changed=%s, length=%s, span=%s, range=%s, samples_per=%s',
                        self._changed, len(self), self._x_range,
                        self._x_range[1] - self._x_range[0], self._samples_per)
         if self._state == 'idle':
             self._stream_notify(self._stream_buffer)
 
+    def _lag_samples_update(self):
+        # depends only on the x range, samples_per and sampling frequency
+        lag_time = self._span_limits[1] - self._x_range[1]
+        self._lag_samples = int(lag_time * self._sampling_frequency) // self._samples_per
+
     def _view(self):
-        buffer = self._stream_buffer
-        _, sample_id_end = buffer.sample_id_range
-        lag_time = self._span.limits[1] - self._x_range[1]
-        lag_samples = int(lag_time * self.sampling_frequency) // self._samples_per
+        _, sample_id_end = self._stream_buffer.sample_id_range
         data_idx_stream_end = sample_id_end // self._samples_per
-        data_idx_view_end = data_idx_stream_end - lag_samples
+        data_idx_view_end = data_idx_stream_end - self._lag_samples
         sample_id_end = data_idx_view_end * self._samples_per
         delta = data_idx_view_end - self._data_idx
         return data_idx_view_end, sample_id_end, delta
@@ -336,6 +428,10 @@ class View:
         return self._stream_buffer.sample_id_to_time(s)
 
     def _stream_notify(self, stream_buffer):
+        if stream_buffer is not None and stream_buffer is not self._stream_buffer:
+            self._sampling_frequency = stream_buffer.sampling_frequency
+            if self._span is not None:
+                self._lag_samples_update()
         self._stream_buffer = stream_buffer
         self._stream_notify_available = True
 
@@ -348,11 +444,10 @@ class View:
             raise ValueError(f'unsupported units {units}')
 
     def _convert_time_range_to_samples(self, start, stop, units):
-        length = len(self)
-        data_idx_view_end, sample_id_end, delta = self._view()
-        start_idx = (data_idx_view_end - length) * self._samples_per
+        if units == 'seconds' and (start is None or stop is None):
+            data_idx_view_end, _, _ = self._view()  # only needed for the defaults
         if start is None and units == 'seconds':
-            start = start_idx
+            start = (data_idx_view_end - len(self)) * self._samples_per
         else:
             start = self._convert_time_to_samples(start, units)
         if stop is None and units == 'seconds':
@@ -365,38 +460,16 @@ class View:
         s1, s2 = self._convert_time_range_to_samples(start, stop, units)
         self._log.debug('_samples_get(start=%r, stop=%r, units=%s) -> %s, %s', start, stop, units, s1, s2)
         data = self._stream_buffer.data_get(start=start, stop=stop)
+        # single copy of the means into [field][N] so each signal is contiguous
+        means = np.ascontiguousarray(np.transpose(data[:, :, 0]))
+        signals = {name: {'value': means[idx], 'units': u} for idx, (name, u) in enumerate(SIGNALS)}
+        signals['raw'] = {
+            'value': self._stream_buffer.raw_get(start=start, stop=stop),
+            'units': 'LSBs',
+        }
         return {
             # 'time': {},
-            'signals': {
-                'current': {
-                    'value': data[:, 0, 0],
-                    'units': 'A',
-                },
-                'voltage': {
-                    'value': data[:, 1, 0],
-                    'units': 'V',
-                },
-                'power': {
-                    'value': data[:, 2, 0],
-                    'units': 'W',
-                },
-                'current_range': {
-                    'value': data[:, 3, 0],
-                    'units': '',
-                },
-                'current_lsb': {
-                    'value': data[:, 4, 0],
-                    'units': '',
-                },
-                'voltage_lsb': {
-                    'value': data[:, 5, 0],
-                    'units': '',
-                },
-                'raw': {
-                    'value': self._stream_buffer.raw_get(start=start, stop=stop),
-                    'units': 'LSBs',
-                },
-            },
+            'signals': signals,
         }
 
     def _statistics_get(self, start=None, stop=None, units=None):
@@ -407,13 +480,14 @@ class View:
         s1, s2 = self._convert_time_range_to_samples(start, stop, units)
         # self._log.debug('buffer %s, %s, %s => %s, %s', start, stop, units, s1, s2)
         d = self._stream_buffer.stats_get(start=s1, stop=s2)
-        t_start = s1 / self.sampling_frequency
-        t_stop = s2 / self.sampling_frequency
+        t_start = s1 / self._sampling_frequency
+        t_stop = s2 / self._sampling_frequency
         return stats_to_api(d, t_start, t_stop)
 
     def open(self):
         self.close()
         self._log.info('open')
+        self._stream_notify_pending.clear()
         self._thread = threading.Thread(name='view', target=self.run)
         self._thread.start()
         self._post_block('ping')
@@ -436,6 +510,7 @@ class View:
             self._thread.join(timeout=TIMEOUT)
             self._thread = None
             self._data = None
+            self._data_storage = None
             on_close, self.on_close = self.on_close, None
             if callable(on_close):
                 try:
@@ -451,7 +526,11 @@ class View:
         self._post('on_x_change', (cmd, kwargs))
 
     def stream_notify(self, stream_buffer):
-        self._post('stream_notify', stream_buffer)
+        # coalesce: at most one stream_notify is queued, and it uses the latest buffer
+        self._stream_notify_buffer = stream_buffer
+        if not self._stream_notify_pending.is_set():
+            self._stream_notify_pending.set()
+            self._post('stream_notify')
 
     def samples_get(self, start=None, stop=None, units=None):
         """Get exact samples over a range.